@@ -0,0 +1,33 @@
+import os
+import threading
+from typing import Optional
+
+from config import ensure_env
+from hubspot import HubSpot
+from urllib3.util.retry import Retry
+
+ensure_env()
+
+_client: Optional[HubSpot] = None
+_lock = threading.Lock()
+
+def get_client() -> Optional[HubSpot]:
+    # One process-wide client: every caller reuses the same warm TLS
+    # connection pool instead of paying a fresh handshake per instance,
+    # and transient 429/5xx responses retry with backoff.
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                token = os.getenv("HUBSPOT_API_KEY")
+                if not token:
+                    return None
+                _client = HubSpot(
+                    access_token = token,
+                    retry = Retry(
+                        total = 3,
+                        backoff_factor = 0.3,
+                        status_forcelist = [429, 500, 502, 503, 504],
+                    ),
+                )
+    return _client
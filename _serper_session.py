@@ -0,0 +1,34 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One pooled, retrying session per process for Serper traffic. Each
+# requests.post() used to open a fresh TCP+TLS connection, and a single
+# question can trigger two Serper calls (site-filtered + broad fallback) —
+# keep-alive removes the handshake from every call after the first.
+_SESSION = None
+_LOCK = threading.Lock()
+
+def get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        with _LOCK:
+            if _SESSION is None:
+                s = requests.Session()
+                s.headers["Content-Type"] = "application/json"
+                s.mount(
+                    "https://",
+                    HTTPAdapter(
+                        pool_connections = 10,
+                        pool_maxsize = 20,
+                        max_retries = Retry(
+                            total = 2,
+                            backoff_factor = 0.2,
+                            status_forcelist = [429, 500, 502, 503, 504],
+                        ),
+                    ),
+                )
+                _SESSION = s
+    return _SESSION
@@ -1,22 +1,49 @@
-from pydantic import BaseModel
-from typing import Optional, Any
+from typing import Annotated, Any, Optional
+
+import msgspec
+from pydantic import BaseModel, ConfigDict, StringConstraints
 
 class ChatRequest(BaseModel):
-    message: str
-    user_id: Optional[str] = None
-    session_id: Optional[str] = None
-    job_number: Optional[str] = None
-    last_name: Optional[str] = None
+    # extra="ignore" + whitespace strip run in pydantic-core (Rust), not Python
+    model_config = ConfigDict(extra = "ignore", str_strip_whitespace = True)
+
+    message: Annotated[str, StringConstraints(max_length = 8192)]
+    user_id: str | None = None
+    session_id: str | None = None
+    job_number: str | None = None
+    last_name: str | None = None
 
 class ChatResponse(BaseModel):
+    model_config = ConfigDict(extra = "ignore")
+
     answered: bool
     answer: str
     answers: Optional[Any] = None
-    ticket_id: Optional[str] = None
-    confidence: Optional[float] = None
+    ticket_id: str | None = None
+    confidence: float | None = None
     need_confirmation: bool = True
     interaction_id: str
 
 class ConfirmRequest(BaseModel):
+    model_config = ConfigDict(extra = "ignore")
+
     interaction_id: str
-    helpful: bool
\ No newline at end of file
+    helpful: bool
+
+# msgspec twins of the request models, used on the hot path in api/app.py.
+# msgspec's C decoder skips the Python-level validation loop entirely; the
+# Pydantic models above stay as the OpenAPI source of truth.
+class ChatRequestStruct(msgspec.Struct, omit_defaults = True):
+    message: Annotated[str, msgspec.Meta(max_length = 8192)]
+    user_id: str | None = None
+    session_id: str | None = None
+    job_number: str | None = None
+    last_name: str | None = None
+
+class ConfirmRequestStruct(msgspec.Struct, omit_defaults = True):
+    interaction_id: str
+    helpful: bool
+
+# Prebuilt decoders — building a Decoder once avoids per-call type lookup
+CHAT_REQUEST_DECODER = msgspec.json.Decoder(ChatRequestStruct)
+CONFIRM_REQUEST_DECODER = msgspec.json.Decoder(ConfirmRequestStruct)
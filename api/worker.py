@@ -0,0 +1,9 @@
+from uvicorn.workers import UvicornWorker
+
+class WarrantyWorker(UvicornWorker):
+    # Gunicorn workers build their uvicorn Config from CONFIG_KWARGS and
+    # never read UVICORN_* env vars, so the loop/http choice has to live
+    # here. loop="none" keeps whichever policy api/app.py installed at
+    # import (rloop on io_uring-capable kernels, else uvloop, else stock
+    # asyncio); httptools parses HTTP several times faster than h11.
+    CONFIG_KWARGS = {"loop": "none", "http": "httptools"}
@@ -0,0 +1,20 @@
+import os
+from dotenv import load_dotenv
+
+# Every module used to call load_dotenv() at import time, which re-parses
+# .env and re-walks os.environ once per module. Funnel them all through a
+# single process-wide load instead.
+_loaded = False
+
+def ensure_env():
+    global _loaded
+    if _loaded:
+        return
+    # Anchor on the repo's .env regardless of the caller's cwd (the old
+    # self_help_agent behaviour), falling back to the default search
+    env_path = os.path.join(os.path.dirname(__file__), ".env")
+    if os.path.isfile(env_path):
+        load_dotenv(env_path)
+    else:
+        load_dotenv()
+    _loaded = True
@@ -1,15 +1,50 @@
-from dotenv import load_dotenv
-import os, json, sys
+from config import ensure_env
+import os, json, sys, select, asyncio
 
-load_dotenv()
+ensure_env()
 
 from self_help_agent import HomeownerHelpAgent
 from orchestrator import WarrantyOrchestrator, CONFIDENCE_GOOD
 from hubspot_tool import HubSpotTool
 
+# Internal line buffer so piped transcripts aren't lost between reads —
+# one os.read can pull several scripted lines at once
+_STDIN_BUF = bytearray()
+
+def _read_line(prompt_text: str = "") -> str:
+    # Select-driven read: accumulate bytes as they arrive instead of parking
+    # in input()'s blocking full-line buffer, so scripted/piped runs don't
+    # hang on partial reads. Falls back to input() when stdin has no fd.
+    if prompt_text:
+        sys.stdout.write(prompt_text)
+        sys.stdout.flush()
+    try:
+        fd = sys.stdin.fileno()
+    except (AttributeError, ValueError, OSError):
+        return input()
+
+    os.set_blocking(fd, False)
+    try:
+        while b"\n" not in _STDIN_BUF:
+            ready, _, _ = select.select([sys.stdin], [], [], 0.05)
+            if not ready:
+                continue
+            chunk = os.read(fd, 1024)
+            if not chunk: # EOF
+                if _STDIN_BUF:
+                    break
+                raise EOFError
+            _STDIN_BUF.extend(chunk)
+    finally:
+        os.set_blocking(fd, True)
+
+    line, _, rest = bytes(_STDIN_BUF).partition(b"\n")
+    _STDIN_BUF[:] = rest
+    return line.decode("utf-8", errors = "replace").rstrip("\r")
+
 def prompt(label: str, required: bool = False, default: str | None = None) -> str:
     while True:
-        val = input(f"{label}{' ['+default+']' if default else ''}: ").strip()
+        val = _read_line(f"{label}{' ['+default+']' if default else ''}: ").strip()
         if not val and default is not None:
             return default
         if val or not required:
@@ -19,14 +54,14 @@ def prompt(label: str, required: bool = False, default: str | None = None) -> st
 def yesno(label: str, default: str = "y") -> bool:
     d = default.lower()
     while True:
-        val = input(f"{label} (y/n) [{d}]: ").strip().lower()
+        val = _read_line(f"{label} (y/n) [{d}]: ").strip().lower()
         if not val:
-            return d == "Y"
+            return d == "y"
         if val in ("y", "yes"): return True
         if val in ("n", "no"): return False
         print(" please enter y or n")
 
-def main():
+async def main():
     job_number = prompt("Job number", required = True)
     last_name = prompt("Last name", required = True)
     email = prompt("Email", required = True)
@@ -44,7 +79,9 @@ def main():
             "open_ticket_if_unresolved": False
         }
 
-        help_res = orchestrator.call_self_help(msg, ctx)
+        # Orchestrator + HubSpot calls are blocking I/O, so run them in
+        # worker threads and keep the event loop free for overlap
+        help_res = await asyncio.to_thread(orchestrator.call_self_help, msg, ctx)
 
         print("\n--- Assistant answer ---")
         print(help_res["answer"])
@@ -56,24 +93,41 @@ def main():
                 print(f" {i}. {q}")
 
         # Ask if resolve or not
+        ticket_task = None
         if yesno("\nDid this resolve your issue?", default = "n" if help_res["confidence"] < CONFIDENCE_GOOD else "y"):
             print("Great! No ticket needed.")
         else:
             if yesno("Open a support ticket now?", default = "y"):
-                ticket = orchestrator.open_ticket(msg, help_res, ctx)
-                print("\n---Ticket---")
-                print(json.dumps(ticket, indent = 2))
+                # The user just said the answer didn't resolve it — reflect
+                # that so should_open_ticket() doesn't skip on a stale
+                # resolved/high-confidence flag
+                help_res["resolved"] = False
+                help_res["confidence"] = min(help_res["confidence"], CONFIDENCE_GOOD - 0.01)
+                # Fire the ticket POST in the background; it races with the
+                # next prompt instead of blocking the loop for a round-trip
+                ticket_task = asyncio.create_task(
+                    asyncio.to_thread(orchestrator.open_ticket, msg, help_res, ctx)
+                )
+                print("(opening the ticket in the background...)")
             else:
                 print("Sounds good!")
 
-        if not yesno("\nAsk another question?", default = "n"):
+        # Prompt in a thread so the pending ticket request keeps running
+        again = await asyncio.to_thread(yesno, "\nAsk another question?", "n")
+
+        if ticket_task is not None:
+            ticket = await ticket_task
+            print("\n---Ticket---")
+            print(json.dumps(ticket, indent = 2))
+
+        if not again:
             break
 
     print("\Bye!")
 
 if __name__ == "__main__":
     try:
-        main()
+        asyncio.run(main())
     except KeyboardInterrupt:
         print("\nInterrupted.")
         sys.exit(1)
\ No newline at end of file
@@ -1,10 +1,10 @@
-from hubspot import HubSpot
-import os
-from dotenv import load_dotenv
+from config import ensure_env
 
-load_dotenv()
+ensure_env()
 
-api = HubSpot(access_token = os.getenv("HUBSPOT_API_KEY"))
+from _hubspot_client import get_client
+
+api = get_client()
 types = api.crm.associations.v4.schema.definitions_api.get_all(from_object_type = "tickets", to_object_type = "contacts")
 
 type_id = next(
@@ -1,18 +1,91 @@
+import atexit
 import os
+import threading
+import time
+from functools import lru_cache
+import pybreaker
+import tenacity
 from hubspot import HubSpot
+from _hubspot_client import get_client
+
+try:
+    from hubspot.crm.tickets.exceptions import ApiException
+except ImportError:
+    ApiException = Exception
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field, EmailStr, field_validator, model_validator, PrivateAttr
-from typing import Literal, Optional, Type
-from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, model_validator, PrivateAttr
+from typing import ClassVar, Literal, Optional, Type
+from config import ensure_env
 from datetime import datetime, timezone
 
-load_dotenv()
+ensure_env()
 
 # Hardcoded for now
 TEST_CONTACT_ID = "65929051"
 
+# Dry-run mode, read once at import instead of 2-3 os.environ probes per
+# operation; tests that flip the env mid-run go through set_mode()
+_HUBSPOT_MODE = os.getenv("HUBSPOT_MODE")
+_DRY = _HUBSPOT_MODE in ("read_only", "dry_run")
+
+# Opt-in batched ticket creation (see TicketBatcher below)
+_BATCH = os.getenv("HUBSPOT_BATCH") == "1"
+
+def set_mode(mode: Optional[str]):
+    global _HUBSPOT_MODE, _DRY
+    _HUBSPOT_MODE = mode
+    _DRY = mode in ("read_only", "dry_run")
+
+# Association type id (ticket -> contact), resolved once per process: the env
+# var wins, otherwise fall back to a single schema lookup against HubSpot
+# instead of re-reading the environment on every ticket create
+_ASSOC_TYPE_ID = os.getenv("HUBSPOT_ASSOC_TICKET_TO_CONTACT_TYPE_ID")
+
+@lru_cache(maxsize = 1)
+def _resolve_assoc_type_id(client: Optional[HubSpot]) -> Optional[str]:
+    if _ASSOC_TYPE_ID:
+        return _ASSOC_TYPE_ID
+    if client is None:
+        return None
+    types = client.crm.associations.v4.schema.definitions_api.get_all(
+        from_object_type = "tickets", to_object_type = "contacts"
+    )
+    return next(
+        (str(d.type_id) for d in getattr(types, "results", []) if getattr(d, "category", "").upper() == "HUBSPOT_DEFINED"),
+        None,
+    )
+
+# Resilience around the ticket API: a bounded retry absorbs HubSpot's
+# intermittent slow/5xx responses, and the breaker stops hammering a degraded
+# portal after 5 straight failures (half-opens after 30s). Retries run inside
+# the breaker so one full retry burst counts as a single failure.
+_BREAKER = pybreaker.CircuitBreaker(fail_max = 5, reset_timeout = 30)
+
+_retry_api = tenacity.retry(
+    stop = tenacity.stop_after_attempt(3),
+    wait = tenacity.wait_exponential_jitter(initial = 1, max = 4),
+    retry = tenacity.retry_if_exception_type(ApiException),
+    reraise = True,
+)
+
+def _call_hubspot(fn, **kwargs):
+    # Returns None when the breaker is open; callers fall back to a
+    # "deferred" result instead of cascading the failure
+    try:
+        return _BREAKER.call(_retry_api(fn), **kwargs)
+    except pybreaker.CircuitBreakerError:
+        return None
+
+
 # Hubspot Schema
 class HubSpotArgs(BaseModel):
+    # Whitespace stripping now runs in pydantic-core (Rust), not Python
+    # field validators; empty strings count as missing in the presence check.
+    # A full discriminated-union split (CreateTicketArgs/UpdateTicketArgs/
+    # GetTicketArgs) doesn't fit crewai's args_schema, which wants one
+    # BaseModel — so dispatch stays table-driven inside this model instead.
+    model_config = ConfigDict(extra = "forbid", str_strip_whitespace = True)
+
     action: Literal["create_ticket", "update_ticket", "get_ticket"] = Field(..., description = "Which HubSpot operation to perform")
 
     # Create a ticket
@@ -27,39 +100,32 @@ class HubSpotArgs(BaseModel):
     ticket_id: Optional[str] = Field(None, description="Existing ticket ID (update/get)")
     note: Optional[str] = Field(None, description="Note text to append (update)")
 
-    # Validation
-    @field_validator("job_number", "last_name", "ticket_description", "description", "note", mode="before")
-    @classmethod
-    def _strip_fields(cls, v):
-        if isinstance(v, str):
-            v = v.strip()
-            return v or None
-        return v
-
-    @field_validator("ticket_id", mode="before")
-    @classmethod
-    def _strip_id(cls, v):
-        return v.strip() if isinstance(v, str) else v
+    # Required fields per action, precomputed once
+    _REQUIRED: ClassVar[dict[str, tuple[str, ...]]] = {
+        "create_ticket": ("job_number", "last_name", "ticket_description", "description"),
+        "update_ticket": ("ticket_id",),
+        "get_ticket": ("ticket_id",),
+    }
 
     @model_validator(mode="after")
     def _require_by_action(self):
-        if self.action == "create_ticket":
-            missing = [
-                k for k in ("job_number", "last_name", "ticket_description", "description")
-                if getattr(self, k) in (None, "")
-            ]
-            if missing:
-                raise ValueError(f"Missing required fields for create_ticket: {', '.join(missing)}")
-        elif self.action in {"update_ticket", "get_ticket"}:
-            if not self.ticket_id:
-                raise ValueError("ticket_id is required for update_ticket/get_ticket")
+        missing = [k for k in self._REQUIRED[self.action] if getattr(self, k) in (None, "")]
+        if missing:
+            raise ValueError(f"Missing required fields for {self.action}: {', '.join(missing)}")
         return self
 
 
 # Helper
+@lru_cache(maxsize = 128)
 def _build_subject(job_number: str, last_name: str, ticket_description: str) -> str:
-    # Trim to 255
-    return f"R - {job_number} - {last_name} - {ticket_description}"[:255]
+    # Trim to 255 *bytes* — HubSpot's limit is bytes, not characters, so a
+    # character slice can still overflow on accented names. Cached since the
+    # CLI repeats the same job_number/last_name all session.
+    s = f"R - {job_number} - {last_name} - {ticket_description}"
+    b = s.encode("utf-8")
+    if len(b) <= 255:
+        return s
+    return b[:255].decode("utf-8", errors = "ignore")
 
 
 def _get_env_ids() -> tuple[str, str]:
@@ -68,17 +134,65 @@ def _get_env_ids() -> tuple[str, str]:
     return os.getenv("HUBSPOT_TICKETS_PIPELINE_ID"), os.getenv("HUBSPOT_TICKETS_STAGE_ID")
 
 
+def _find_contact_ids_by_emails(client: Optional[HubSpot], emails: list[str]) -> dict[str, str]:
+    # One IN-filter search per 100 emails (the HubSpot filter-values cap)
+    # instead of one round-trip per email
+    if client is None or not emails:
+        return {}
+    out: dict[str, str] = {}
+    for i in range(0, len(emails), 100):
+        chunk = emails[i : i + 100]
+        req = {
+            "filterGroups": [{"filters": [{"propertyName": "email", "operator": "IN", "values": chunk}]}],
+            "properties": ["email"],
+            "limit": len(chunk),
+        }
+        res = client.crm.contacts.search_api.do_search(public_object_search_request = req)
+        for r in getattr(res, "results", []) or []:
+            email = (getattr(r, "properties", None) or {}).get("email")
+            if email:
+                out[email] = r.id
+    return out
+
+
 def _find_contact_id_by_email(client: Optional[HubSpot], email: str) -> Optional[str]:
-    if client is None:
-        return None
-    req = {
-        "filterGroups": [{"filters": [{"propertyName": "email", "operator": "EQ", "value": email}]}],
-        "properties": ["email"],
-        "limit": 1,
-    }
-    res = client.crm.contacts.search_api.do_search(public_object_search_request = req)
-    results = getattr(res, "results", []) or []
-    return results[0].id if results else None
+    # Single-email callers ride the batch path with a chunk of one
+    return _find_contact_ids_by_emails(client, [email]).get(email)
+
+
+# Opt-in create batching (HUBSPOT_BATCH=1): N creates collapse into
+# ceil(N/100) requests against the batch API — 100 is HubSpot's batch cap.
+# Flushes when the buffer hits 100, when the oldest entry is ~2s old, or at
+# process exit.
+class TicketBatcher:
+    def __init__(self, client, flush_size: int = 100, max_age: float = 2.0):
+        self._client = client
+        self._flush_size = flush_size
+        self._max_age = max_age
+        self._buffer: list[dict] = []
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def add(self, payload: dict):
+        with self._lock:
+            self._buffer.append(payload)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = len(self._buffer) >= self._flush_size or (time.monotonic() - self._oldest) >= self._max_age
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            buffered, self._buffer = self._buffer, []
+            self._oldest = None
+        if not buffered or self._client is None:
+            return None
+        return _call_hubspot(
+            self._client.crm.tickets.batch_api.create,
+            batch_input_simple_public_object_input_for_create = {"inputs": buffered},
+        )
 
 
 # Implementation
@@ -91,37 +205,21 @@ class HubSpotTool(BaseTool):
     # Pydantic model
     _portal_id: str = PrivateAttr(default = "0")
     _client: Optional[HubSpot] = PrivateAttr(default = None)
+    _batcher: Optional[TicketBatcher] = PrivateAttr(default = None)
 
     def __init__(self, **data):
         super().__init__(**data)
-        token = os.getenv("HUBSPOT_API_KEY")
         self._portal_id = os.getenv("HUBSPOT_PORTAL_ID")
-        self._client = HubSpot(access_token = token) if token else None
+        self._client = get_client() # shared, pooled, retrying
+        if _BATCH:
+            self._batcher = TicketBatcher(self._client)
 
-    def _run(
-            self,
-            action: Literal["create_ticket", "update_ticket", "get_ticket"],
-            job_number: Optional[str] = None,
-            last_name: Optional[str] = None,
-            ticket_description: Optional[str] = None,
-            description: Optional[str] = None,
-            ticket_id: Optional[str] = None,
-            note: Optional[str] = None,
-    ):
-        if action == "create_ticket":
-            return self._create_ticket(
-                job_number = job_number,
-                last_name = last_name,
-                ticket_description = ticket_description,
-                description = description,
-            )
-
-        if action == "update_ticket":
-            return self._update_ticket(ticket_id = ticket_id, note = note)
-
-        if action == "get_ticket":
-            return self._get_ticket(ticket_id = ticket_id)
-        raise ValueError(f"Unknown action: {action}")
+    def _run(self, action: Literal["create_ticket", "update_ticket", "get_ticket"], **kwargs):
+        try:
+            handler, accepted = self._DISPATCH[action]
+        except KeyError:
+            raise ValueError(f"Unknown action: {action}")
+        return handler(self, **{k: kwargs.get(k) for k in accepted})
 
     # Operations
     def _create_ticket(
@@ -149,7 +247,7 @@ class HubSpotTool(BaseTool):
                 "types": [
                     {
                         "associationCategory": "HUBSPOT_DEFINED",
-                        "associationTypeId": str(os.getenv("HUBSPOT_ASSOC_TICKET_TO_CONTACT_TYPE_ID"))
+                        "associationTypeId": str(_resolve_assoc_type_id(self._client))
                     }
                 ]
             }
@@ -158,11 +256,11 @@ class HubSpotTool(BaseTool):
         payload = {"properties": props, "associations": associations}
 
         # Dry modes: don't call HubSpot — just echo the payload
-        if os.getenv("HUBSPOT_MODE") in ("read_only", "dry_run"):
+        if _DRY:
             now = datetime.now(timezone.utc).isoformat()
             print(f"Would CREATE ticket with payload:\n{payload}")
             return {
-                "status": os.getenv("HUBSPOT_MODE"),
+                "status": _HUBSPOT_MODE,
                 "ticket_id": "dryrun-0",
                 "url": f"https://app.hubspot.com/contacts/{self._portal_id}/tickets/dryrun-0",
                 "payload": payload,
@@ -172,10 +270,19 @@ class HubSpotTool(BaseTool):
         if not self._client:
             raise RuntimeError("Missing HUBSPOT TOKEN")
 
-        created = self._client.crm.tickets.basic_api.create(
+        if self._batcher is not None:
+            # Batched mode: the create rides the next batch_api flush; the
+            # id arrives asynchronously, so callers get a queued marker
+            self._batcher.add({"properties": props, "associations": associations})
+            return {"status": "queued", "ticket_id": None, "payload": payload}
+
+        created = _call_hubspot(
+            self._client.crm.tickets.basic_api.create,
             # can change to = payload
-            simple_public_object_input_for_create = {"properties": props, "associations": associations}
+            simple_public_object_input_for_create = {"properties": props, "associations": associations},
         )
+        if created is None: # breaker open — defer instead of cascading
+            return {"status": "deferred", "ticket_id": None, "payload": payload}
 
         created_at = getattr(created, "createdAt", None) or getattr(created, "createdAt", None)
 
@@ -191,31 +298,45 @@ class HubSpotTool(BaseTool):
         return out
 
     def _update_ticket(self, ticket_id: str, note: str):
-        if os.getenv("HUBSPOT_MODE") in ("read_only", "dry_run"):
+        if _DRY:
             print(f"Would UPDATE ticket {ticket_id} with note:\n{note}")
-            return {"status": os.getenv("HUBSPOT_MODE"), "ticket_id": ticket_id}
+            return {"status": _HUBSPOT_MODE, "ticket_id": ticket_id}
 
         if not self._client:
             raise RuntimeError("Missing HUBSPOT TOKEN")
 
-        self._client.crm.tickets.basic_api.update(
+        updated = _call_hubspot(
+            self._client.crm.tickets.basic_api.update,
             ticket_id = ticket_id,
             simple_public_object_input_for_update = {"properties": {"content": note}},
         )
-        return {"status": "updated", "ticket_id": p["ticket_id"]}
+        if updated is None:
+            return {"status": "deferred", "ticket_id": ticket_id}
+        return {"status": "updated", "ticket_id": ticket_id}
 
     def _get_ticket(self, ticket_id: str):
-        if os.getenv("HUBSPOT_MODE") in ("read_only", "dry_run") or str(ticket_id).startswith("dryrun"):
-            print(f"[HUBSPOT:{os.getenv('HUBSPOT_MODE')}] Would GET ticket {ticket_id}")
-            return {"status": os.getenv("HUBSPOT_MODE"), "ticket_id": ticket_id}
+        if _DRY or str(ticket_id).startswith("dryrun"):
+            print(f"[HUBSPOT:{_HUBSPOT_MODE}] Would GET ticket {ticket_id}")
+            return {"status": _HUBSPOT_MODE, "ticket_id": ticket_id}
 
         if not self._client:
             raise RuntimeError("HubSpot client not initialized (missing HUBSPOT_TOKEN).")
 
-        ticket = self._client.crm.tickets.basic_api.get_by_id(ticket_id)
+        ticket = _call_hubspot(self._client.crm.tickets.basic_api.get_by_id, ticket_id = ticket_id)
+        if ticket is None:
+            return {"status": "deferred", "ticket_id": ticket_id}
         created_at = getattr(ticket, "createdAt", None) or getattr(ticket, "createdAt", None)
         return {
             "ticket_id": ticket.id,
             "properties": ticket.properties,
             "createdAt": created_at.isoformat() if hasattr(ticket, "isoformat") else str(ticket.createdAt) if created_at else None
         }
+
+    # Action -> (unbound handler, kwargs it accepts), resolved once at class
+    # creation instead of an if/elif chain per call; args_schema already
+    # enforces per-action required fields
+    _DISPATCH: ClassVar[dict[str, tuple]] = {
+        "create_ticket": (_create_ticket, ("job_number", "last_name", "ticket_description", "description")),
+        "update_ticket": (_update_ticket, ("ticket_id", "note")),
+        "get_ticket": (_get_ticket, ("ticket_id",)),
+    }
@@ -3,25 +3,32 @@ from typing import Any, Dict
 
 CONFIDENCE_GOOD = 0.75
 
+# Keys a fully formed help result carries
+_HELP_KEYS = {"answer", "resolved", "confidence", "followups", "title"}
+
 def normalize_help_result(raw: Any) -> Dict[str, Any]:
     if isinstance(raw, dict):
-        base = {
-            "answer": "",
-            "resolved": False,
-            "confidence": 0.5,
-            "followups": [],
-            "title": "Homeowner issue"
-        }
-        base.update(raw)
-
-        # Check exist
-        base["answer"] = str(base.get("answer", "") or "")
-        base["resolved"] = bool(base.get("resolved", False))
-        base["confidence"] = float(base.get("confidence", 0.5) or 0.0)
-        base["followups"] = base.get("followups") or []
-        base["title"] = str(base.get("title") or "Homeowner issue")
+        # Fast path: a well-formed result passes through untouched — no
+        # base-dict allocation and no re-coercion of already-typed fields
+        if (
+            raw.keys() >= _HELP_KEYS
+            and isinstance(raw["answer"], str)
+            and isinstance(raw["resolved"], bool)
+            and isinstance(raw["confidence"], float)
+        ):
+            return raw
 
-        return base
+        # Single pass, coercing only fields that miss the target type
+        answer = raw.get("answer") or ""
+        confidence = raw.get("confidence", 0.5)
+        title = raw.get("title") or "Homeowner issue"
+        return {
+            "answer": answer if isinstance(answer, str) else str(answer),
+            "resolved": bool(raw.get("resolved", False)),
+            "confidence": confidence if isinstance(confidence, float) else float(confidence or 0.0),
+            "followups": raw.get("followups") or [],
+            "title": title if isinstance(title, str) else str(title),
+        }
     return {
         "answer": str(raw) if raw is not None else "",
         "resolved": False,
@@ -49,7 +56,16 @@ class WarrantyOrchestrator:
                 raw = self.self_help(message) if callable(self.self_help) else {"answer": "", "resolved": False}
         return normalize_help_result(raw)
 
+    def should_open_ticket(self, help_res: Dict[str, Any]) -> bool:
+        return not help_res["resolved"] and help_res["confidence"] < CONFIDENCE_GOOD
+
     def open_ticket(self, message: str, help_res: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+        # Callers may invoke unconditionally (e.g. a batch loop); a resolved
+        # or high-confidence result skips the whole ticket path without a
+        # HubSpot roundtrip
+        if not self.should_open_ticket(help_res):
+            return {"status": "skipped", "ticket_id": None}
+
         job = ctx.get("job_number")
         last = ctx.get("last_name")
         title = help_res.get("title")
@@ -0,0 +1,20 @@
+#!/usr/bin/env bash
+# Production topology: gunicorn managing uvicorn workers.
+#
+# Workers = 2*CPU+1 while the endpoints still block on LLM/HubSpot calls;
+# once the handlers are fully async, drop this to $(nproc) and let each
+# worker multiplex on its event loop instead.
+#
+# WarrantyWorker pins loop="none" so the policy installed in api/app.py
+# wins: rloop (io_uring) on Linux >= 6.1 when available, else uvloop
+# (~2x the default asyncio loop). httptools parses HTTP several times
+# faster than the pure-python h11 fallback.
+set -euo pipefail
+
+WORKERS="${WEB_CONCURRENCY:-$((2 * $(nproc) + 1))}"
+
+exec gunicorn api.app:app \
+    -k api.worker.WarrantyWorker \
+    --workers "$WORKERS" \
+    --worker-connections 2048 \
+    --bind "${BIND:-0.0.0.0:8000}"
@@ -1,13 +1,36 @@
+import asyncio
+import atexit
 import os
 import inspect
 import json
+import heapq
+import logging
+import logging.handlers
+import pathlib
+import queue
+import re
+import threading
 import requests
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from _serper_session import get_session
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+from config import ensure_env
 from crewai import Agent, Task, Crew
 
+try:
+    import orjson
+    # orjson decodes straight from bytes, 2-5x faster than stdlib json on
+    # Serper-sized payloads
+    def _json_loads(resp):
+        return orjson.loads(resp.content)
+except ImportError:
+    def _json_loads(resp):
+        return resp.json()
+
 # env
-env_path = os.path.join(os.path.dirname(__file__), '.env')
-load_dotenv(env_path)
+ensure_env()
 
 try:
     # prefer real package
@@ -29,97 +52,340 @@ except Exception:
             q = search_query or query
             if not q:
                 raise RuntimeError("SEARCH_QUERY is required")
-            r = requests.post(
+            r = get_session().post(
                 "https://google.serper.dev/search",
-                headers = {"X-API-KEY": self._key, "Content-Type": "application/json"},
-                json = {"q": q},
+                headers = {"X-API-KEY": self._key},
+                json = {"q": q, "num": 10},
                 timeout = 20,
             )
             r.raise_for_status()
-            return r.json()
+            # Only organic is ever read; drop knowledgeGraph/peopleAlsoAsk/
+            # relatedSearches etc. before the payload gets cached
+            return {"organic": _json_loads(r).get("organic") or []}
+
+# Hot-path env reads resolved once at import, after ensure_env()
+_DEBUG_TOOLS = os.getenv("DEBUG_TOOLS") == "1"
+_SERPER_API_KEY = os.getenv("SERPER_API_KEY")
+
+# Rank key bound once; results without a position sort last
+def _position_key(r):
+    return r.get("position", 1 << 30)
+
+# Homeowner questions repeat heavily ("water heater reset", "HVAC filter"),
+# so keep the final post-sort/post-fallback Serper payloads for an hour
+# (tunable via SERPER_CACHE_TTL). Key is the query lowercased with whitespace
+# collapsed. A second cache sits under _call_serper so the site-filtered and
+# broad-fallback calls hit independently and the raw payloads are shared.
+_SERPER_TTL = float(os.getenv("SERPER_CACHE_TTL", "3600"))
+# TTLCache moves expiry links even on reads, so every cache shared across
+# threadpool workers needs its lock
+_KB_RESULT_CACHE = TTLCache(maxsize = 512, ttl = _SERPER_TTL)
+_KB_RESULT_CACHE_LOCK = threading.Lock()
+_SERPER_CACHE = TTLCache(maxsize = 1024, ttl = _SERPER_TTL)
+_SERPER_CACHE_LOCK = threading.Lock()
+
+def _serper_cache_key(self, q, **kwargs):
+    return hashkey(q.strip().lower())
+
+def _kb_cache_key(self, query = None, search_query = None, **kwargs):
+    return hashkey(" ".join(((search_query or query) or "").split()).lower())
+
+# Refinement reuse: when a question merely narrows an earlier one ("leaky
+# faucet" -> "leaky faucet bathroom"), the narrower answer set is a subset of
+# the cached broader one — filter locally instead of going back to Serper.
+_REFINE_MIN_HITS = 3
+
+def _is_token_subsequence(small, big):
+    it = iter(big)
+    return all(tok in it for tok in small)
+
+def _refine_from_cache(q_norm):
+    q_tokens = q_norm.split()
+    if len(q_tokens) < 2:
+        return None
+    with _KB_RESULT_CACHE_LOCK:
+        snapshot = list(_KB_RESULT_CACHE.items())
+    for key, cached_res in snapshot:
+        prev = key[0]
+        if prev == q_norm or not _is_token_subsequence(prev.split(), q_tokens):
+            continue
+        new_terms = [t for t in q_tokens if t not in prev.split()]
+        organic = (cached_res or {}).get("organic") or []
+        kept = [
+            item for item in organic
+            if all(
+                t in f"{item.get('title', '')} {item.get('snippet', '')}".lower()
+                for t in new_terms
+            )
+        ]
+        if len(kept) >= _REFINE_MIN_HITS:
+            refined = dict(cached_res)
+            # The broader result may carry _compose_task_text's stashed
+            # formatted block; the refined copy must not inherit it or the
+            # prompt would show hits the filter just removed
+            refined.pop("_kb_block", None)
+            refined["organic"] = kept
+            return refined
+    return None
+
+@lru_cache(maxsize = 1)
+def _serper_run_kw():
+    # Which kwarg the installed crewai_tools SerperDevTool.run accepts,
+    # probed once per process — inspect.signature walks the MRO and builds a
+    # Signature object, too heavy to repeat on every query
+    try:
+        params = inspect.signature(SerperDevTool.run).parameters
+    except Exception:
+        return None
+    if "search_query" in params:
+        return "search_query"
+    if "query" in params:
+        return "query"
+    return None
 
 # VM Support Site search tool (used directly, not passed into Agent.tools)
 class KBSearchTool(SerperDevTool):
+    @cached(_SERPER_CACHE, key = _serper_cache_key, lock = _SERPER_CACHE_LOCK)
     def _call_serper(self, q, **kwargs):
-        # If using the real crewai_tools impl, try both param names
+        # If using the real crewai_tools impl, use its (cached) param name
         if _HAS_CREWAI_TOOLS:
-            try:
-                sig = inspect.signature(super().run)
-                if "search_query" in sig.parameters:
-                    return super().run(search_query = q, **kwargs)
-                if "query" in sig.parameters:
-                    return super().run(query = q, **kwargs)
-            except Exception:
-                pass
-
-        # Fallback: direct HTTP
-        key = os.getenv("SERPER_API_KEY")
+            kw = _serper_run_kw()
+            if kw:
+                try:
+                    raw = super().run(**{kw: q}, **kwargs)
+                    if type(raw) is dict:
+                        return {"organic": raw.get("organic") or []}
+                    return raw
+                except Exception:
+                    pass
+
+        # Fallback: direct HTTP — num=10 shrinks the response off the wire,
+        # and only organic survives into the cache
+        key = _SERPER_API_KEY
         if not key:
             raise RuntimeError("SERPER_API_KEY is required for Serper")
-        r = requests.post(
+        r = get_session().post(
             "https://google.serper.dev/search",
-            headers = {"X-API-KEY": key, "Content-Type": "application/json"},
-            json = {"q": q},
+            headers = {"X-API-KEY": key},
+            json = {"q": q, "num": 10},
             timeout = 20,
         )
         r.raise_for_status()
-        return r.json()
+        return {"organic": _json_loads(r).get("organic") or []}
 
     # Accept BOTH `query` and `search_query`
+    @cached(_KB_RESULT_CACHE, key = _kb_cache_key, lock = _KB_RESULT_CACHE_LOCK)
     def run(self, query = None, search_query = None, **kwargs):
         q = search_query or query
         if not q:
             raise ValueError("query is required")
 
+        # Refinements of an already-cached broader query resolve locally;
+        # the decorator stores the refined result under the new key
+        refined = _refine_from_cache(" ".join(q.split()).lower())
+        if refined is not None:
+            if _DEBUG_TOOLS:
+                print(f"[KBSearchTool] refined q={q} from cached broader query")
+            return refined
+
         kb_query = f"site:support.vanmetrehomes.com {q}"
-        if os.getenv("DEBUG_TOOLS") == "1":
+        if _DEBUG_TOOLS:
             print(f"[KBSearchTool] q={q} kb_query={kb_query}")
 
         kb_results = self._call_serper(kb_query, **kwargs)
 
         organic = (kb_results or {}).get("organic") or []
         if organic:
-            kb_results["organic"] = sorted(organic, key = lambda r: r.get("position", float("inf")))
+            # Serper already returns organic ordered by position almost
+            # always — one linear pass confirms it and skips the sort.
+            # Otherwise only the top 10 matter, so partial-select instead
+            # of fully sorting the list.
+            pos = [_position_key(r) for r in organic]
+            if all(pos[i] <= pos[i + 1] for i in range(len(pos) - 1)):
+                kb_results["organic"] = organic[:10]
+            else:
+                kb_results["organic"] = heapq.nsmallest(10, organic, key = _position_key)
             return kb_results
 
-        if os.getenv("DEBUG_TOOLS") == "1":
+        if _DEBUG_TOOLS:
             print("[KBSearchTool] no KB hits, falling back to broad web query")
         return self._call_serper(q, **kwargs)
 
 
-# Optional local PDF/doc embeddings search
-try:
-    from langchain_community.document_loaders import DirectoryLoader
-    from langchain_openai import OpenAIEmbeddings
-    from langchain_community.vectorstores import Chroma
-
-    class DocumentSearchTool:
-        def __init__(self, docs_path = "./data"):
-            self.vectorstore = None
-            if not os.path.isdir(docs_path):
+# Optional local PDF/doc embeddings search. The langchain/chromadb stack is
+# imported lazily inside __init__ — importing this module no longer drags in
+# chromadb + OpenAIEmbeddings during CLI cold start when no PDFs exist.
+# Query embeddings repeat with the questions themselves; keep the vectors
+# around so a hot query skips the OpenAI embed round trip entirely
+_QEMBED_CACHE = TTLCache(maxsize = 1024, ttl = _SERPER_TTL)
+_QEMBED_LOCK = threading.Lock()
+
+class DocumentSearchTool:
+    def __init__(self, docs_path = "./data"):
+        # Construction is free: the scan/parse/embed work (potentially
+        # minutes on a cold index) is deferred to the first run() so agents
+        # built for health checks or warmup never pay it
+        self.docs_path = docs_path
+        self.vectorstore = None
+        self.collection = None
+        self.embed = None
+        self._built = False
+        self._build_lock = threading.Lock()
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        with self._build_lock:
+            if self._built:
                 return
-            loader = DirectoryLoader(docs_path, glob = "**/*.pdf")
-            docs = loader.load()
-            if not docs:
-                return
-            self.vectorstore = Chroma.from_documents(docs, embedding = OpenAIEmbeddings())
+            try:
+                self._build()
+            finally:
+                self._built = True
 
-        def run(self, query: str, k: int = 4):
-            if not getattr(self, "vectorstore", None):
-                return []
+    def _build(self):
+        docs_path = self.docs_path
+        if not os.path.isdir(docs_path):
+            return
+
+        try:
+            from langchain_community.document_loaders import DirectoryLoader
+            from langchain_openai import OpenAIEmbeddings
+            from langchain_community.vectorstores import Chroma
+        except ImportError:
+            return
+
+        persist_dir = os.path.join(docs_path, ".chroma")
+        manifest_fp = os.path.join(persist_dir, "manifest.json")
+
+        # Per-file manifest of (mtime, size): on a warm start only the PDFs
+        # that actually changed get re-parsed and re-embedded, instead of
+        # rebuilding the whole index on any change
+        current = {
+            str(p): f"{int(os.path.getmtime(p))}|{os.path.getsize(p)}"
+            for p in sorted(pathlib.Path(docs_path).rglob("*.pdf"))
+        }
+
+        saved = {}
+        try:
+            with open(manifest_fp, "r", encoding = "utf-8") as f:
+                saved = json.load(f).get("files") or {}
+        except Exception:
+            pass
+
+        have_store = os.path.isdir(persist_dir)
+        if have_store and saved == current:
+            self.embed = OpenAIEmbeddings()
+            self.vectorstore = Chroma(persist_directory = persist_dir, embedding_function = self.embed)
+            self.collection = self.vectorstore._collection
+            return
+
+        if not current:
+            return
+
+        embed_batch = int(os.getenv("OPENAI_EMBED_BATCH", "256"))
+        self.embed = OpenAIEmbeddings(chunk_size = embed_batch)
+        vectorstore = Chroma(
+            persist_directory = persist_dir,
+            embedding_function = self.embed,
+        )
+
+        changed = [p for p, sig in current.items() if saved.get(p) != sig]
+        stale = [p for p in saved if p not in current or p in changed]
+        if have_store and stale:
+            try:
+                vectorstore._collection.delete(where = {"source": {"$in": stale}})
+            except Exception:
+                pass
+
+        # Producer/consumer ingest: a parser thread streams each changed
+        # PDF's docs through a bounded queue while this thread embeds and
+        # inserts the previous batch — CPU-bound parsing overlaps the
+        # network-bound embed calls and peak RAM stays near one batch.
+        # Embedding round trips carry OPENAI_EMBED_BATCH inputs each and
+        # Chroma inserts go 200 docs at a time.
+        def _add_batch(batch):
+            vectorstore.add_texts(
+                texts = [d.page_content for d in batch],
+                metadatas = [d.metadata for d in batch],
+            )
+
+        doc_q: queue.Queue = queue.Queue(maxsize = 4)
+
+        def _parse_changed():
+            try:
+                for rel in (os.path.relpath(p, docs_path) for p in changed):
+                    loader = DirectoryLoader(
+                        docs_path,
+                        glob = rel,
+                        use_multithreading = True,
+                        max_concurrency = os.cpu_count() or 4,
+                    )
+                    doc_q.put(loader.load())
+            finally:
+                doc_q.put(None)
+
+        parser = threading.Thread(target = _parse_changed, daemon = True)
+        parser.start()
+
+        pending = []
+        while True:
+            file_docs = doc_q.get()
+            if file_docs is None:
+                break
+            pending.extend(file_docs)
+            while len(pending) >= 200:
+                _add_batch(pending[:200])
+                del pending[:200]
+        if pending:
+            _add_batch(pending)
+        parser.join()
+        self.vectorstore = vectorstore
+        self.collection = vectorstore._collection
+        with open(manifest_fp, "w", encoding = "utf-8") as f:
+            json.dump({"files": current}, f)
+
+    def run(self, query: str, k: int = 4):
+        self._ensure_built()
+        if not getattr(self, "vectorstore", None):
+            return []
+        # similarity_search re-embeds the query (an OpenAI round trip) on
+        # every call; cache the vector and hit the raw collection instead
+        try:
+            key = query.strip().lower()
+            with _QEMBED_LOCK:
+                qvec = _QEMBED_CACHE.get(key)
+            if qvec is None:
+                qvec = self.embed.embed_query(query)
+                with _QEMBED_LOCK:
+                    _QEMBED_CACHE[key] = qvec
+            res = self.collection.query(
+                query_embeddings = [qvec],
+                n_results = k,
+                include = ["documents", "metadatas"],
+            )
+            docs = (res.get("documents") or [[]])[0]
+            metas = (res.get("metadatas") or [[]])[0]
+            return [
+                {"page_content": doc, "metadata": meta or {}}
+                for doc, meta in zip(docs, metas)
+            ]
+        except Exception:
             results = self.vectorstore.similarity_search(query, k = k)
             return [{"page_content": d.page_content, "metadata": d.metadata} for d in results]
-except ImportError:
-    DocumentSearchTool = None
 
 
+# One precompiled pass collapses runs of whitespace (newlines included)
+# instead of chaining strip/replace allocations per snippet
+_WS = re.compile(r"\s+")
+
 def _format_kb_block(kb_json) -> str:
     organic = (kb_json or {}).get("organic") or []
     lines = []
     for item in organic[:5]:
         title   = (item.get("title") or "").strip()
         link    = (item.get("link") or item.get("url") or "").strip()
-        snippet = (item.get("snippet") or item.get("description") or "").strip()
+        snippet = _WS.sub(" ", item.get("snippet") or item.get("description") or "").strip()
         if title or link or snippet:
             lines.append(f"- {title}\n  {snippet}\n  Source: {link}")
     return "\n".join(lines) if lines else "No KB results found."
@@ -133,7 +399,7 @@ def _format_doc_block(doc_json_list) -> str:
         meta    = d.get("metadata") or {}
         source  = meta.get("source") or meta.get("file_path") or ""
         page    = meta.get("page", "")
-        snippet = (d.get("page_content") or "").strip().replace("\n", " ")
+        snippet = _WS.sub(" ", d.get("page_content") or "").strip()
         if len(snippet) > 400:
             snippet = snippet[:400] + "..."
         src_str = f"{source}" + (f" (page {page})" if page != "" else "")
@@ -141,19 +407,69 @@ def _format_doc_block(doc_json_list) -> str:
     return "\n".join(lines)
 
 
+# Trace logging: verbose=True made CrewAI print full LLM traces to stdout
+# synchronously for every question. Traces now go to a rotating file through a
+# queue, so the agent loop never blocks on I/O; VERBOSE_TRACES=1 restores the
+# old stdout firehose for debugging.
+_VERBOSE_TRACES = os.getenv("VERBOSE_TRACES") == "1"
+
+def _build_trace_logger() -> logging.Logger:
+    log = logging.getLogger("warranty_crew.traces")
+    if log.handlers:
+        return log
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    q: queue.Queue = queue.Queue(-1)
+    file_handler = logging.handlers.RotatingFileHandler(
+        "traces.log", maxBytes = 5_000_000, backupCount = 2, encoding = "utf-8"
+    )
+    listener = logging.handlers.QueueListener(q, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    log.addHandler(logging.handlers.QueueHandler(q))
+    return log
+
+_TRACE_LOG = _build_trace_logger()
+
+def _trace_step(step):
+    # One structured JSON line per agent step; repr-fallback for step
+    # objects that aren't JSON-serializable
+    try:
+        _TRACE_LOG.info(json.dumps({"step": str(step)[:2000]}))
+    except Exception:
+        pass
+
+
+# Static instruction tail, built once instead of re-concatenated per question
+_PROMPT_TAIL = (
+    "Write a clear, numbered, step-by-step guide that answers the user's question. "
+    "Prefer steps supported by Internal Documents. "
+    "When a step is derived from a specific source, append '(Source: URL or file)'. "
+    "Keep the steps concise and homeowner-friendly."
+    "If the information is insufficient or ambiguous, ask ONE specific follow-up question starting with 'Follow-up: ' and stop."
+)
+
+
 # Agent wrapper used by orchestrator
 class HomeownerHelpAgent:
     def __init__(self):
         self.kb_tool = KBSearchTool()
         self.doc_tool = None
-
-        if DocumentSearchTool:
-            try:
-                tmp = DocumentSearchTool()
-                if getattr(tmp, "vectorstore", None):
-                    self.doc_tool = tmp
-            except Exception:
-                self.doc_tool = None
+        # Single-slot replay cache for the sync CLI path (see run()).
+        # Kept as one tuple so the store is a single atomic attribute
+        # write — two separate fields could interleave under the API's
+        # concurrent threadpool callers and pair one question with
+        # another's answer
+        self._last = (None, None)
+
+        # ENABLE_DOC_SEARCH=0 skips the vector store (and its lazy
+        # langchain/chromadb imports) entirely; construction is cheap now,
+        # so gate only on PDFs actually existing — the index builds on the
+        # first query
+        if os.getenv("ENABLE_DOC_SEARCH", "1") != "0":
+            docs_path = "./data"
+            if os.path.isdir(docs_path) and any(pathlib.Path(docs_path).rglob("*.pdf")):
+                self.doc_tool = DocumentSearchTool(docs_path)
 
         # NOTE: We DO NOT pass tools to the Agent to avoid BaseTool validation errors.
         self.agent = Agent(
@@ -163,66 +479,156 @@ class HomeownerHelpAgent:
             verbose = False,
         )
 
-    def run(self, question: str) -> str:
-        # 1) Search KB (direct call, not via Agent.tools)
-        kb_json   = {}
-        try:
-            kb_json = self.kb_tool.run(search_query = question)
-        except Exception as e:
-            kb_json = {"error": str(e)}
-
-        # 2) Optional doc search
-        # Old langchain method
-        # docs_json = []
-        # if self.doc_tool:
-        #     try:
-        #         docs_json = self.doc_tool.run(question)
-        #     except Exception as e:
-        #         docs_json = [{"page_content": f"[Doc search error: {e}]", "metadata": {}}]
-        #
-        # kb_block   = _format_kb_block(kb_json)
-        # doc_block  = _format_doc_block(docs_json)
-
-        docs_json = []
-
-        try:
-            if hasattr(self, "kb") and self.kb:
-                docs_json = self.kb.search(question, k = 6)
-            else:
-                docs_json = []
-        except Exception as e:
-            docs_json = [{ " page_content": f"[KB error: {e}", "metadata": {}}]
-
-        kb_block = _format_kb_block(kb_json)
-        doc_block = _format_doc_block(docs_json)
-
-        # 3) Summarization task—feed the results directly
-        desc  = (
-            f"User question: '{question}'\n\n"
-            f"Internal Documents:\n{doc_block}\n\n"
-            f"Search results from support.vanmetrehomes.com:\n{kb_block}\n\n"
+        # Task/Crew construction runs pydantic validation + LLM client setup,
+        # so build them once here and swap the per-question text in run().
+        # The pair is single-occupancy — _task_lock guards the mutate+kickoff
+        # window against concurrent run() callers (the API serves /chat off a
+        # threadpool through this sync path)
+        self._task_lock = threading.Lock()
+        self._task = Task(
+            description = "",
+            expected_output = "",
+            agent = self.agent,
+            verbose = _VERBOSE_TRACES,
         )
-
-        #if self.doc_tool:
-            #desc += f"Uploaded document snippets:\n{doc_block}\n\n"
-
-        desc += (
-            "Write a clear, numbered, step-by-step guide that answers the user's question. "
-            "Prefer steps supported by Internal Documents. "
-            "When a step is derived from a specific source, append '(Source: URL or file)'. "
-            "Keep the steps concise and homeowner-friendly."
-            "If the information is insufficient or ambiguous, ask ONE specific follow-up question starting with 'Follow-up: ' and stop."
+        self._crew = Crew(
+            agents = [self.agent],
+            tasks = [self._task],
+            verbose = _VERBOSE_TRACES,
+            step_callback = _trace_step,
         )
 
-        task_summarize = Task(
+    def run(self, question: str) -> str:
+        # Cheap guards before any network: blank input never leaves the
+        # process, and a re-submitted identical question (double Enter in a
+        # chat UI) replays the previous answer
+        question = (question or "").strip()
+        if not question:
+            return "Please enter a question."
+        last_q, last_answer = self._last
+        if question == last_q:
+            return last_answer
+
+        # 1) + 2) Web KB search and internal doc search are independent I/O,
+        # so dispatch both at once — retrieval wait drops from t_kb + t_doc
+        # to max(t_kb, t_doc)
+        with ThreadPoolExecutor(max_workers = 3) as pool:
+            kb_future = pool.submit(self.kb_tool.run, search_query = question)
+            hits_future = pool.submit(self._kb_hits, question, 6)
+            doc_future = pool.submit(self.doc_tool.run, question) if self.doc_tool else None
+
+            try:
+                kb_json = kb_future.result()
+            except Exception as e:
+                kb_json = {"error": str(e)}
+            docs_json = hits_future.result() # _kb_hits already swallows errors
+            if doc_future is not None:
+                try:
+                    docs_json = docs_json + doc_future.result()
+                except Exception:
+                    pass
+
+        # Reuse the prebuilt Task/Crew when it's free — only the text changes
+        # per question. If another request holds it mid-kickoff, build a
+        # fresh pair (as run_async does) rather than overwriting its task
+        # text or waiting out someone else's LLM call
+        desc, expected = self._compose_task_text(question, kb_json, docs_json)
+        if self._task_lock.acquire(blocking = False):
+            try:
+                self._task.description = desc
+                self._task.expected_output = expected
+                answer = self._crew.kickoff()
+            finally:
+                self._task_lock.release()
+        else:
+            task = Task(
+                description = desc,
+                expected_output = expected,
+                agent = self.agent,
+                verbose = _VERBOSE_TRACES,
+            )
+            crew = Crew(
+                agents = [self.agent],
+                tasks = [task],
+                verbose = _VERBOSE_TRACES,
+                step_callback = _trace_step,
+            )
+            answer = crew.kickoff()
+        self._last = (question, answer)
+        return answer
+
+    async def run_async(self, question: str):
+        # Async entry point for concurrent callers (multiple homeowners per
+        # process). Retrieval reuses the sync tools — and their caches — via
+        # worker threads; a fresh Task/Crew per call keeps concurrent
+        # questions from racing on the shared prebuilt task text.
+        tasks = [
+            asyncio.to_thread(self.kb_tool.run, search_query = question),
+            asyncio.to_thread(self._kb_hits, question, 6),
+        ]
+        if self.doc_tool:
+            tasks.append(asyncio.to_thread(self.doc_tool.run, question))
+        results = await asyncio.gather(*tasks, return_exceptions = True)
+
+        kb_json = {"error": str(results[0])} if isinstance(results[0], BaseException) else results[0]
+        docs_json = [] if isinstance(results[1], BaseException) else results[1]
+        if self.doc_tool and not isinstance(results[2], BaseException):
+            docs_json = docs_json + results[2]
+
+        desc, expected = self._compose_task_text(question, kb_json, docs_json)
+        task = Task(
             description = desc,
-            expected_output = f"A numbered list of steps answering: '{question}', with source URLs where applicable.",
+            expected_output = expected,
             agent = self.agent,
-            verbose = True,
+            verbose = _VERBOSE_TRACES,
+        )
+        crew = Crew(
+            agents = [self.agent],
+            tasks = [task],
+            verbose = _VERBOSE_TRACES,
+            step_callback = _trace_step,
         )
+        kickoff_async = getattr(crew, "kickoff_async", None)
+        if kickoff_async is not None:
+            return await kickoff_async()
+        return await asyncio.to_thread(crew.kickoff)
+
+    async def run_many(self, questions, concurrency = 8):
+        # Bulk entry point for offline/batch workloads: the pipeline is I/O
+        # bound, so a semaphore-bounded gather scales near-linearly up to the
+        # Serper/OpenAI rate limits. Duplicate questions collapse onto one
+        # in-flight call; retrieval additionally rides the TTL caches.
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _bounded(q):
+            async with sem:
+                return await self.run_async(q)
+
+        unique = {q: None for q in questions}
+        answers = await asyncio.gather(*(_bounded(q) for q in unique))
+        by_question = dict(zip(unique, answers))
+        return [by_question[q] for q in questions]
+
+    def _compose_task_text(self, question, kb_json, docs_json):
+        # Cache hits hand back the same kb_json dict, so stash the formatted
+        # block on it and skip re-running the string work for repeats; doc
+        # hits are rebuilt per call and stay un-memoized
+        if type(kb_json) is dict:
+            kb_block = kb_json.get("_kb_block")
+            if kb_block is None:
+                kb_block = kb_json["_kb_block"] = _format_kb_block(kb_json)
+        else:
+            kb_block = _format_kb_block(kb_json)
+        doc_block = _format_doc_block(docs_json)
 
-        crew = Crew(agents = [self.agent], tasks = [task_summarize], verbose = True)
-        return crew.kickoff()
+        # Summarization task—feed the results directly
+        desc = (
+            f"User question: '{question}'\n\n"
+            f"Internal Documents:\n{doc_block}\n\n"
+            f"Search results from support.vanmetrehomes.com:\n{kb_block}\n\n"
+        ) + _PROMPT_TAIL
+        expected = f"A numbered list of steps answering: '{question}', with source URLs where applicable."
+        return desc, expected
 
     def _kb_hits(self, question: str, k: int = 6): # 6 -> number of KB chunks to pull (not too low and not too high)
         try:
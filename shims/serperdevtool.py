@@ -1,7 +1,23 @@
 import os
-import requests
+import threading
 from typing import Optional, Any, Dict
 
+from _serper_session import get_session
+from cachetools import TTLCache
+
+try:
+    import orjson
+    def _json_loads(resp):
+        return orjson.loads(resp.content)
+except ImportError:
+    def _json_loads(resp):
+        return resp.json()
+
+# Serper responses keyed on (endpoint, query, extra params); homeowner
+# queries repeat, so an hour of reuse saves both latency and API quota
+_CACHE = TTLCache(maxsize = 1024, ttl = float(os.getenv("SERPER_CACHE_TTL", "3600")))
+_CACHE_LOCK = threading.Lock()
+
 class SerperDevTool:
     name: str = "SerperDevTool"
     description: str = "Search via Serper (Google) API; returns JSON."
@@ -13,11 +29,21 @@ class SerperDevTool:
     def run(self, *, search_query: str, **kwargs: Any) -> Dict[str, Any]:
         if not self.api_key:
             return {"organic": []}
-        payload: Dict[str, Any] = {"q": search_query}
+        payload: Dict[str, Any] = {"q": search_query, "num": 10}
         for k, v in kwargs.items():
             if v is not None:
                 payload[k] = v
-        headers = {"X-API-KEY": self.api_key, "Content-Type": "application/json"}
-        resp = requests.post(self.endpoint, json=payload, headers=headers, timeout=15)
+        key = (self.endpoint, search_query.strip().lower(), tuple(sorted((k, str(v)) for k, v in payload.items() if k != "q")))
+        with _CACHE_LOCK:
+            hit = _CACHE.get(key)
+        if hit is not None:
+            return hit
+        headers = {"X-API-KEY": self.api_key}
+        resp = get_session().post(self.endpoint, json=payload, headers=headers, timeout=15)
         resp.raise_for_status()
-        return resp.json()
+        # Callers only consume organic; caching the full payload just burns
+        # RAM on knowledgeGraph/answerBox blocks nobody reads
+        out = {"organic": _json_loads(resp).get("organic") or []}
+        with _CACHE_LOCK:
+            _CACHE[key] = out
+        return out
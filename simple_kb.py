@@ -1,11 +1,50 @@
 import os, io, json, hashlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import numpy as np
+import tenacity
 import tiktoken
 from pypdf import PdfReader
 import docx2txt
-from openai import OpenAI
+from openai import OpenAI, RateLimitError
+
+try:
+    # Optional SIMD cosine kernels; search falls back to the NumPy path
+    # when the wheel isn't installed
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Approximate-nearest-neighbour index; turns the O(N) scan into a
+    # graph walk. Opt-in via KB_HNSW=1 since recall is approximate.
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+try:
+    # Columnar meta storage; far smaller on disk and much faster to parse
+    # than a json list of dicts once the corpus grows. JSON remains the
+    # fallback format when pyarrow isn't installed.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    # blake3 hashes several GB/s vs sha1's hundreds of MB/s; the digests
+    # are only dedup/change keys, so either works — keep sha1 as fallback
+    from blake3 import blake3 as _new_hasher
+except ImportError:
+    _new_hasher = hashlib.sha1
 
 OPENAI_EMBED_MODEL = "text-embedding-3-small" # -large more expensive
 INDEX_DIR = os.getenv("KB_INDEX_DIR", "/data/vm_kb")
@@ -16,6 +55,33 @@ CHUNK_OVERLAP_TOKENS = int(os.getenv("KB_CHUNK_OVERLAP", "60")) # avoids cutting
 
 os.makedirs(INDEX_DIR, exist_ok = True)
 
+# Below this row count the PCIe transfer outweighs any GPU speedup, so the
+# CUDA path only engages on corpora big enough for the scan to dominate
+_GPU_MIN_ROWS = int(os.getenv("KB_GPU_MIN_ROWS", "200000"))
+_TORCH = None # lazy: torch module once probed, False when unusable
+
+_HNSW = hnswlib is not None and os.getenv("KB_HNSW") == "1"
+
+# orjson serializes straight to utf-8 bytes in native code; the stdlib
+# encoder stays as the fallback
+def _json_dump(obj, fp: str):
+    if orjson is not None:
+        with open(fp, "wb") as f:
+            f.write(orjson.dumps(obj))
+    else:
+        with open(fp, "w", encoding = "utf-8") as f:
+            json.dump(obj, f)
+
+def _json_load(fp: str):
+    with open(fp, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
+
+# Opt-in int8 search path: unit-norm rows quantize to signed bytes with a
+# fixed 127 scale, quartering the matrix scan's memory traffic. Needs the
+# simsimd i8 kernels; ranking shifts are negligible at this chunk size.
+_INT8 = simsimd is not None and os.getenv("KB_INT8") == "1"
+
 # Chunk record
 @dataclass
 class KBChunk:
@@ -24,6 +90,90 @@ class KBChunk:
     page: Optional[int]
     sha: str # detect duplicates
 
+# File parsing runs in worker processes (parsing + tokenizing + hashing are
+# CPU-bound and independent per file), so the loaders live at module level
+# and each worker lazily builds its own tokenizer — the OpenAI client on the
+# instance never crosses the process boundary.
+_WORKER_ENC = None
+
+def _get_worker_enc():
+    global _WORKER_ENC
+    if _WORKER_ENC is None:
+        _WORKER_ENC = tiktoken.get_encoding("cl100k_base")
+    return _WORKER_ENC
+
+def _chunk_text_tokens(enc, text: str) -> List[str]:
+    toks = enc.encode(text)
+    step = max(1, CHUNK_TOKENS - CHUNK_OVERLAP_TOKENS) # ensures adjacent windows overlap, so not cutting the word
+    windows = [toks[i:i + CHUNK_TOKENS] for i in range(0, len(toks), step)]
+    if not windows:
+        return []
+    # One FFI round trip into tiktoken's Rust core instead of one per window
+    return enc.decode_batch(windows)
+
+# PDF loader, page-by-page. extract_text() dominates big manuals, so pages
+# run on a thread pool; executor.map keeps the results in page order.
+def _pdf_file_chunks(enc, fpath: str) -> List[KBChunk]:
+    reader = PdfReader(fpath)
+    pages = reader.pages
+    if len(pages) > 1:
+        with ThreadPoolExecutor(max_workers = min(8, len(pages))) as pool:
+            texts = list(pool.map(lambda p: p.extract_text() or "", pages))
+    else:
+        texts = [p.extract_text() or "" for p in pages]
+    out: List[KBChunk] = []
+    for i, txt in enumerate(texts, start = 1):
+        if not txt.strip(): continue
+        for ch in _chunk_text_tokens(enc, txt):
+            sha = _new_hasher((fpath + str(i) + ch).encode("utf-8")).hexdigest()
+            out.append(KBChunk(text = ch, source = fpath, page = i, sha = sha))
+    return out
+
+# Docx loader, read entire body at once
+def _docx_file_chunks(enc, fpath: str) -> List[KBChunk]:
+    txt = docx2txt.process(fpath) or ""
+    out: List[KBChunk] = []
+    for ch in _chunk_text_tokens(enc, txt):
+        sha = _new_hasher((fpath + ch).encode("utf-8")).hexdigest()
+        out.append(KBChunk(text = ch, source = fpath, page = None, sha = sha))
+    return out
+
+# Txt loader
+def _text_file_chunks(enc, fpath: str) -> List[KBChunk]:
+    with io.open(fpath, "r", encoding = "utf-8", errors = "ignore") as f:
+        txt = f.read()
+    out: List[KBChunk] = []
+    for ch in _chunk_text_tokens(enc, txt):
+        sha = _new_hasher((fpath + ch).encode("utf-8")).hexdigest()
+        out.append(KBChunk(text = ch, source = fpath, page = None, sha = sha))
+    return out
+
+_LOADERS = {
+    ".pdf": _pdf_file_chunks,
+    ".docx": _docx_file_chunks,
+    ".txt": _text_file_chunks,
+}
+
+def _file_sha(fpath: str) -> str:
+    # Content hash per source file; size/mtime alone can miss restored
+    # backups and touch(1) noise
+    h = _new_hasher()
+    with open(fpath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _parse_one_file(fpath: str) -> List[KBChunk]:
+    ext = os.path.splitext(fpath.lower())[1]
+    loader = _LOADERS.get(ext)
+    if loader is None:
+        return []
+    try:
+        return loader(_get_worker_enc(), fpath)
+    except Exception as e:
+        print(f"Failed to load {fpath}: {e}")
+        return []
+
 # Main class
 class SimpleKB:
     def __init__(self, client: Optional[OpenAI] = None):
@@ -33,8 +183,15 @@ class SimpleKB:
         self.meta: List[Dict[str, Any]] = []
         self.index_fp = os.path.join(INDEX_DIR, "kb_vectors.npy")
         self.meta_fp = os.path.join(INDEX_DIR, "kb_meta.json")
+        self.meta_pq_fp = os.path.join(INDEX_DIR, "kb_meta.parquet")
+        self.files_fp = os.path.join(INDEX_DIR, "kb_files.json")
+        self.i8_fp = os.path.join(INDEX_DIR, "kb_vectors_i8.npy")
+        self.vectors_i8: Optional[np.ndarray] = None
+        self._gpu_vectors = None # device-resident copy, built on first big query
+        self.hnsw_fp = os.path.join(INDEX_DIR, "kb_hnsw.bin")
+        self._hnsw = None
 
-        self.load()
+        self._load()
 
         # If nothing loaded, build index once at startup
         # If index exists, reindex only if docs digest changed
@@ -70,150 +227,363 @@ class SimpleKB:
         # Return top-k chunks as {page_content, metadata} dicts. Common RAG tool outputs.
         if self.vectors is None or not len(self.meta):
             return []
-            qvec = self._embed_texts([query])[0]
-            sims = self._cosine_sim(self.vectors, qvec)
-            idx = np.argsort(-sims)[:k] # descending, top-k indices
-            out = []
-            for i in idx:
-                m = dict(self.meta[i])
-                m["score"] = float(sims[i])
-                out.append({
-                    "page_content": m.pop("text", ""),
-                    "metadata": m
-                })
-            return out
+        qvec = np.frombuffer(self._embed_query(query), dtype = EMB_DTYPE)
+        if self._hnsw is not None:
+            q = np.ascontiguousarray(qvec, dtype = EMB_DTYPE).reshape(1, -1)
+            labels, dists = self._hnsw.knn_query(q, k = min(k, len(self.meta)))
+            idx = labels[0]
+            scores = 1.0 - dists[0]
+        else:
+            sims = self._sims(qvec)
+            # Partial-select the top k then sort just those k — a full argsort
+            # of all N similarities is wasted work for k=5
+            if k < len(sims):
+                top = np.argpartition(-sims, k)[:k]
+                idx = top[np.argsort(-sims[top])]
+            else:
+                idx = np.argsort(-sims)
+            scores = sims[idx]
+        out = []
+        for i, s in zip(idx, scores):
+            m = dict(self.meta[i])
+            m["score"] = float(s)
+            out.append({
+                "page_content": m.pop("text", ""),
+                "metadata": m
+            })
+        return out
 
     # Rebuild the vectors (rebuild the coordinates), since changing, moving documents in data, the text and embeddings need to be refreshed
     def reindex(self) -> Tuple[int, int]:
-        # Re-scan DOCS_DIR and rebuild the index.
-        chunks = self._load_all_chunks(DOCS_DIR)
-        if not chunks: # reset/clear
-            self.vectors = None
-            self.meta = []
+        # Re-scan DOCS_DIR. Per-file content shas (kb_files.json) let an
+        # edited tree re-embed only the new or changed files: rows from
+        # removed/modified sources are dropped, fresh chunks are embedded
+        # and vstacked on, everything else keeps its existing vectors.
+        paths = self._list_doc_paths(DOCS_DIR)
+        current = {p: _file_sha(p) for p in paths}
+        saved = self._load_file_shas()
+
+        if self.vectors is None or not len(self.meta) or not saved:
+            # No reusable index — full build
+            vectors, meta = self._build_rows(self._iter_chunks(paths))
+            self.vectors, self.meta = vectors, meta
             self._save()
-            return (0, 0)
+            self._save_file_shas(current)
+            if self.vectors is None:
+                return (0, 0)
+            return (len(self.meta), self.vectors.shape[1])
+
+        stale = {p for p in saved if current.get(p) != saved[p]} # removed or modified
+        fresh = [p for p in current if p not in saved or p in stale]
+        if not stale and not fresh:
+            return (len(self.meta), self.vectors.shape[1])
+
+        if stale:
+            keep = np.array([m["source"] not in stale for m in self.meta], dtype = bool)
+            self.vectors = np.ascontiguousarray(self.vectors[keep])
+            self.meta = [m for m, k in zip(self.meta, keep) if k]
+
+        if fresh:
+            new_vecs, new_meta = self._build_rows(self._iter_chunks(fresh))
+            if new_meta:
+                if self.vectors is None or not len(self.vectors):
+                    self.vectors = new_vecs
+                else:
+                    self.vectors = np.vstack([self.vectors, new_vecs])
+                self.meta.extend(new_meta)
+
+        if not len(self.meta):
+            self.vectors = None
+        self._save()
+        self._save_file_shas(current)
+        dim = 0 if self.vectors is None else self.vectors.shape[1]
+        return (len(self.meta), dim)
+
+    def _build_rows(self, chunk_iter: Iterator[KBChunk]) -> Tuple[Optional[np.ndarray], List[Dict[str, Any]]]:
+        # Consume parsed chunks in waves instead of materializing the whole
+        # corpus: each wave of 512 (eight concurrent 64-chunk API batches)
+        # embeds while the pool keeps parsing the next files, so peak
+        # chunk-buffer memory is one wave regardless of corpus size.
+        # Identical chunk texts — cover pages, legal boilerplate, shared
+        # appendices — embed once; `seen` fans the row out to every
+        # occurrence, across waves too.
+        WAVE = 512
+        seen: Dict[str, np.ndarray] = {}
+        blocks: List[np.ndarray] = []
+        meta: List[Dict[str, Any]] = []
+        buf: List[KBChunk] = []
+
+        def _flush():
+            keys = [_new_hasher(c.text.encode("utf-8")).hexdigest() for c in buf]
+            new_order: Dict[str, int] = {}
+            new_texts: List[str] = []
+            for c, key in zip(buf, keys):
+                if key not in seen and key not in new_order:
+                    new_order[key] = len(new_texts)
+                    new_texts.append(c.text)
+            if new_texts:
+                vecs = self._l2_normalize(self._embed_texts(new_texts).astype(EMB_DTYPE))
+                for key, pos in new_order.items():
+                    seen[key] = vecs[pos]
+            blocks.append(np.stack([seen[key] for key in keys]))
+            meta.extend(self._chunk_meta(c) for c in buf)
+            buf.clear()
+
+        for c in chunk_iter:
+            buf.append(c)
+            if len(buf) >= WAVE:
+                _flush()
+        if buf:
+            _flush()
+
+        if not blocks:
+            return None, meta
+        return (blocks[0] if len(blocks) == 1 else np.vstack(blocks)), meta
 
-        texts = [c.text for c in chunks] # embedding purpose
-        vecs = self._embed_texts(texts)
-        self.vectors = vecs.astype(EMB_DTYPE)
-        self.meta = [{
+    @staticmethod
+    def _chunk_meta(c: KBChunk) -> Dict[str, Any]:
+        return {
             "source": c.source,
             "page": c.page,
             "sha": c.sha,
             "text": c.text
-        } for c in chunks] # stores richer info
+        }
 
-        self._save()
-        return (len(chunks), self.vectors.shape[1])
+    def _load_file_shas(self) -> Dict[str, str]:
+        try:
+            return _json_load(self.files_fp)
+        except Exception:
+            return {}
+
+    def _save_file_shas(self, shas: Dict[str, str]):
+        _json_dump(shas, self.files_fp)
 
     def _save(self):
+        self._gpu_vectors = None # matrix changed; re-upload lazily
         if self.vectors is not None:
-            np.save(self.index_fp, self.vectors)
+            # Half-precision on disk: embeddings tolerate the rounding and
+            # the file (and every cold read of it) halves in size
+            np.save(self.index_fp, np.asarray(self.vectors, dtype = np.float16), allow_pickle = False)
         else:
             try: os.remove(self.index_fp)
             except FileNotFoundError: pass
 
-        with open(self.meta_fp, "w", encodings = "utf-8") as f:
-            json.dump(self.meta, f)
+        if _HNSW and self.vectors is not None:
+            index = hnswlib.Index(space = "cosine", dim = self.vectors.shape[1])
+            index.init_index(max_elements = len(self.vectors), ef_construction = 200, M = 16)
+            index.add_items(np.asarray(self.vectors, dtype = EMB_DTYPE), np.arange(len(self.vectors)))
+            index.set_ef(64)
+            index.save_index(self.hnsw_fp)
+            self._hnsw = index
+        else:
+            self._hnsw = None
+            try: os.remove(self.hnsw_fp)
+            except FileNotFoundError: pass
+
+        if _INT8 and self.vectors is not None:
+            self.vectors_i8 = self._quantize_i8(self.vectors)
+            np.save(self.i8_fp, self.vectors_i8)
+        else:
+            self.vectors_i8 = None
+            try: os.remove(self.i8_fp)
+            except FileNotFoundError: pass
+
+        if pq is not None:
+            cols = {k: [m.get(k) for m in self.meta] for k in ("source", "page", "sha", "text")}
+            pq.write_table(pa.table(cols), self.meta_pq_fp)
+            try: os.remove(self.meta_fp)
+            except FileNotFoundError: pass
+        else:
+            _json_dump(self.meta, self.meta_fp)
 
     def _load(self):
         try:
-            self.vectors = np.load(self.index_fp).astype(EMB_DTYPE)
-            with open(self.meta_fp, "r", encoding = "utf-8") as f:
-                self.meta = json.load(f)
+            # Vectors are stored float16; upcast to the working dtype and
+            # re-normalize (unit norms drift slightly under f16 rounding).
+            # Legacy f32 indexes skip the copy and stay memory-mapped.
+            arr = np.load(self.index_fp, mmap_mode = "r")
+            if arr.dtype != EMB_DTYPE or (
+                len(arr) and abs(float(np.linalg.norm(np.asarray(arr[0], dtype = EMB_DTYPE))) - 1.0) > 1e-3
+            ):
+                arr = self._l2_normalize(np.ascontiguousarray(arr, dtype = EMB_DTYPE))
+            self.vectors = arr
+            if pq is not None and os.path.exists(self.meta_pq_fp):
+                self.meta = pq.read_table(self.meta_pq_fp).to_pylist()
+            else:
+                self.meta = _json_load(self.meta_fp)
+            if _INT8:
+                try:
+                    self.vectors_i8 = np.ascontiguousarray(np.load(self.i8_fp), dtype = np.int8)
+                except Exception:
+                    # Sidecar missing (index written before quantization) —
+                    # derive it; _save persists it on the next reindex
+                    self.vectors_i8 = self._quantize_i8(self.vectors)
+            if _HNSW:
+                try:
+                    index = hnswlib.Index(space = "cosine", dim = self.vectors.shape[1])
+                    index.load_index(self.hnsw_fp, max_elements = len(self.vectors))
+                    index.set_ef(64)
+                    self._hnsw = index
+                except Exception:
+                    # No saved graph (pre-HNSW index) — brute force until
+                    # the next reindex writes one
+                    self._hnsw = None
         except Exception:
             self.vectors, self.meta = None, []
 
-    # Embeddings (batched)
+    # Repeat questions skip the embedding round trip entirely. Cached as
+    # bytes because ndarrays aren't hashable; frombuffer in search() wraps
+    # them zero-copy.
+    @lru_cache(maxsize = 256)
+    def _embed_query(self, query: str) -> bytes:
+        qvec = self._embed_texts([query])[0]
+        qvec /= max(float(np.linalg.norm(qvec)), 1e-8)
+        return qvec.tobytes()
+
+    # Embeddings (batched, concurrent)
+    @tenacity.retry(
+        stop = tenacity.stop_after_attempt(4),
+        wait = tenacity.wait_exponential_jitter(initial = 1, max = 8),
+        retry = tenacity.retry_if_exception_type(RateLimitError),
+        reraise = True,
+    )
+    def _embed_batch(self, batch: List[str]):
+        return self.client.embeddings.create(model = OPENAI_EMBED_MODEL, input = batch)
+
     def _embed_texts(self, texts: List[str]) -> np.ndarray:
-        out = []
+        # Batches fly concurrently — the work is pure network wait, so eight
+        # in flight turn ~160 serial round trips on a big reindex into ~20
+        # waves; rate-limit hits back off per batch via tenacity. Results
+        # land row-block by row-block in one preallocated (N, d) array — the
+        # old per-vector np.array + double vstack copied every float three
+        # times (~60 MB of churn on a 10k-chunk reindex)
         B = 64 # batch size
-        for i in range(0, len(texts), B):
-            batch = texts[i : i + B]
-            resp = self.client.embeddings.create(model = OPENAI_EMBED_MODEL, input = batch)
-            vecs = [np.array(e.embedding, dtype = EMB_DTYPE) for e in resp.data]
-            out.append(np.vstack(vecs))
-        return np.vstack(out)
-
-    # Check for similarity using cosine. -1 (opposite), 1 (identical). Angle between 2 vectors.
-    def _cosine_sim(self, A: np.ndarray, b: np.ndarray) -> np.ndarray:
-        denom = (np.linalg.norm(A, axis = 1) * np.linalg.norm(b) + 1e-8)
-        return (A @ b) / denom
+        batches = [texts[i : i + B] for i in range(0, len(texts), B)]
+        if not batches:
+            return np.empty((0, 0), dtype = EMB_DTYPE)
+
+        with ThreadPoolExecutor(max_workers = min(8, len(batches))) as pool:
+            responses = list(pool.map(self._embed_batch, batches))
+
+        out: Optional[np.ndarray] = None
+        row = 0
+        for batch, resp in zip(batches, responses):
+            block = np.asarray([e.embedding for e in resp.data], dtype = EMB_DTYPE)
+            if out is None:
+                out = np.empty((len(texts), block.shape[1]), dtype = EMB_DTYPE)
+            out[row : row + len(batch)] = block
+            row += len(batch)
+        return out
+
+    @staticmethod
+    def _l2_normalize(A: np.ndarray) -> np.ndarray:
+        # Unit-norm rows once at build/load: cosine then degrades to a dot
+        # product, so each query costs one BLAS pass instead of re-norming
+        # the whole matrix
+        if A is not None and len(A):
+            norms = np.linalg.norm(A, axis = 1, keepdims = True)
+            np.divide(A, np.maximum(norms, 1e-8), out = A)
+        return A
+
+    @staticmethod
+    def _quantize_i8(A: np.ndarray) -> np.ndarray:
+        # Rows are unit-norm, so components sit in [-1, 1]; 127 uses the
+        # full signed-byte range
+        return np.clip(np.round(A * 127.0), -127, 127).astype(np.int8)
+
+    def _gpu_sims(self, qvec: np.ndarray) -> Optional[np.ndarray]:
+        # torch is imported on first use only — it is a heavy import and
+        # most deployments never cross _GPU_MIN_ROWS. The matrix uploads
+        # once and stays resident; each query moves just one vector over.
+        global _TORCH
+        if _TORCH is None:
+            try:
+                import torch
+                _TORCH = torch if torch.cuda.is_available() else False
+            except Exception:
+                _TORCH = False
+        if _TORCH is False:
+            return None
+        if self._gpu_vectors is None:
+            self._gpu_vectors = _TORCH.from_numpy(
+                np.array(self.vectors, dtype = EMB_DTYPE, copy = True)
+            ).to("cuda")
+        q = _TORCH.from_numpy(np.array(qvec, dtype = EMB_DTYPE, copy = True)).to("cuda")
+        return (self._gpu_vectors @ q).cpu().numpy()
+
+    def _sims(self, qvec: np.ndarray) -> np.ndarray:
+        # simsimd's fused kernel makes one SIMD pass over the matrix; the
+        # fallback is a single sgemv since rows and query are unit-norm
+        if len(self.vectors) >= _GPU_MIN_ROWS:
+            sims = self._gpu_sims(qvec)
+            if sims is not None:
+                return sims
+        if _INT8 and self.vectors_i8 is not None:
+            q8 = self._quantize_i8(qvec.reshape(1, -1))
+            d = simsimd.cdist(self.vectors_i8, q8, metric = "cosine")
+            return 1.0 - np.asarray(d, dtype = EMB_DTYPE).ravel()
+        if simsimd is not None:
+            d = simsimd.cdist(self.vectors, qvec.reshape(1, -1), metric = "cosine")
+            return 1.0 - np.asarray(d, dtype = EMB_DTYPE).ravel()
+        return self.vectors @ qvec
 
     # Chunk, by tokens (embeddings & LLMS cont tokens.
     def _chunk_text(self, text:str) -> List[str]:
-        toks = self.enc.encode(text)
-        chunks = []
-        step = max(1, CHUNK_TOKENS - CHUNK_OVERLAP_TOKENS) # ensures adjacent windows overlap, so not cutting the word
-        for i in range(0, len(toks), step):
-            window = toks[i:i + CHUNK_TOKENS]
-            if not window: break
-            chunks.append(self.enc.decode(window))
-        return chunks
+        return _chunk_text_tokens(self.enc, text)
 
-    def _load_all_chunks(self, root: str) -> List[KBChunk]:
-        chunks: List[KBChunk] = []
-        for dirpath, _, filenames in os.walk(root):
-            for fn in filenames:
-                fpath = os.path.join(dirpath, fn)
-                ext = os.path.splitext(fn.lower())[1]
-                try:
-                    if ext == ".pdf":
-                        chunks.extend(self._pdf_chunks(fpath))
-                    elif ext == ".docx":
-                        chunks.extend(self._pdf_chunks(fpath))
-                    elif ext in (".txt"):
-                        chunks.extend(self._text_chunks(fpath))
-                except Exception as e:
-                    print(f"Failed to load {fpath}: {e}")
-        return chunks
-
-    # PDF loader, page-by-page
-    def _pdf_chunks(self, fpath: str) -> List[KBChunk]:
-        reader = PdfReader(fpath)
-        out: List[KBChunk] = []
-        for i, page in enumerate(reader.pages, start = 1):
-            txt = page.extract_text() or ""
-            if not txt.strip(): continue
-            for ch in self._chunk_text(txt):
-                sha = hashlib.sha1((fpath + str(i) + ch).encode("utf-8")).hexdigest()
-                out.append(KBChunk(text = ch, source = fpath, page = i, sha = sha))
-        return out
+    @staticmethod
+    def _list_doc_paths(root: str) -> List[str]:
+        return [
+            os.path.join(dirpath, fn)
+            for dirpath, _, filenames in os.walk(root)
+            for fn in filenames
+            if os.path.splitext(fn.lower())[1] in _LOADERS
+        ]
 
-    # Docx loader, read entire body at once
-    def _docx_chunks(self, fpath: str) -> List[KBChunk]:
-        txt = docx2txt.process(fpath) or ""
-        out: List[KBChunk] = []
-        for ch in self._chunk_text(txt):
-            sha = hashlib.sha1((fpath + ch).encode("utf-8")).hexdigest()
-            out.append(KBChunk(text = ch, source = fpath, page = None, sha = sha))
-        return out
+    def _load_all_chunks(self, root: str) -> List[KBChunk]:
+        return list(self._iter_chunks(self._list_doc_paths(root)))
 
-    # Txt loader
-    def _text_chunks(self, fpath: str) -> List[KBChunk]:
-        with io.open(fpath, "r", encoding = "utf-8", errors = "ignore") as f:
-            txt = f.read()
-        out: List[KBChunk] = []
-        for ch in self._chunk_text(txt):
-            sha = hashlib.sha1((fpath + ch).encode("utf-8")).hexdigest()
-            out.append(KBChunk(text = ch, source = fpath, page = None, sha = sha))
-        return out
+    def _iter_chunks(self, paths: List[str]) -> Iterator[KBChunk]:
+        if not paths:
+            return
+        # One process per core across files; a single file isn't worth the
+        # pool spin-up. imap streams each file's chunks out as soon as that
+        # worker finishes rather than waiting on the whole batch.
+        if len(paths) == 1:
+            yield from _parse_one_file(paths[0])
+            return
+        workers = min(os.cpu_count() or 1, len(paths))
+        with multiprocessing.Pool(workers) as pool:
+            for file_chunks in pool.imap(_parse_one_file, paths):
+                yield from file_chunks
 
     # Auto-reindex check
-    def _docs_digest(self, root:str) -> str:
-        # Compute a stable digest of the docs tree (paths + sizes + mtimes)
-        items = []
-        for dirpath, _, filenames in os.walk(root): # _ don't need the dirnames
-            for fn in sorted(filenames):
-                fpath = os.path.join(dirpath, fn)
-                try:
-                    st = os.stats(fpath)
-                except FileNotFoundError:
-                    continue
-                rel = os.path.relpath(fpath, root)
-                items.append(f"{rel}|{st.st_size}|{int(st.st_mtime)}")
-        data = "\n".join(items).encode("utf-8")
-        return hashlib.sha1(data).hexdigest()
+    def _docs_digest(self, root: str) -> str:
+        # Compute a stable digest of the docs tree (paths + sizes + mtimes).
+        # scandir hands back DirEntry objects whose stat() reuses what the
+        # directory read already fetched — os.walk + a stat per file did
+        # two syscalls where one suffices — and each record feeds the
+        # hasher as it is produced instead of joining one giant string.
+        h = _new_hasher()
+
+        def _walk(d: str):
+            try:
+                entries = sorted(os.scandir(d), key = lambda e: e.name)
+            except FileNotFoundError:
+                return
+            for e in entries:
+                if e.is_dir(follow_symlinks = False):
+                    _walk(e.path)
+                elif e.is_file(follow_symlinks = False):
+                    try:
+                        st = e.stat()
+                    except FileNotFoundError:
+                        continue
+                    rel = os.path.relpath(e.path, root)
+                    h.update(f"{rel}|{st.st_size}|{int(st.st_mtime)}\n".encode("utf-8"))
+
+        _walk(root)
+        return h.hexdigest()
 
     def _load_saved_digest(self) -> str:
         fp = os.path.join(INDEX_DIR, "docs_digest.txt")
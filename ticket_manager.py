@@ -1,8 +1,8 @@
-from dotenv import load_dotenv
+from config import ensure_env
 import os
 from crewai import Agent, Task, Crew
 from hubspot_tool import HubSpotTool
 
-load_dotenv()
+ensure_env()
 
 # Init tool and agent
\ No newline at end of file
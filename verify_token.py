@@ -1,6 +1,6 @@
 import os
-from dotenv import load_dotenv
+from config import ensure_env
 
-load_dotenv()
+ensure_env()
 
 print("token_prefix:", (os.getenv("HUBSPOT_API_KEY") or "")[:6])
\ No newline at end of file